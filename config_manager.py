@@ -4,37 +4,87 @@ Handles secure in-memory credential collection and validation.
 NEVER stores credentials to disk for security.
 """
 
+import ctypes
 import getpass
 from typing import Optional
 from dataclasses import dataclass
 
 
-@dataclass
+def wipe_secret(secret: Optional[bytearray]):
+    """
+    Overwrite a secret buffer with zeros in place.
+    
+    Uses ctypes.memset on the bytearray's own storage, which CPython cannot
+    optimize away, unlike reassigning an immutable str.
+    """
+    if not secret:
+        return
+    view = (ctypes.c_char * len(secret)).from_buffer(secret)
+    ctypes.memset(ctypes.addressof(view), 0, len(secret))
+    del view  # Release the buffer export so the bytearray can be resized again
+
+
+_WHITESPACE = b" \t\r\n"
+
+
+def _secure_input(prompt: str) -> bytearray:
+    """
+    Read a hidden value into a bytearray, stripping whitespace in place.
+    
+    Avoids the extra stripped str copy that getpass().strip() would leave
+    on the heap, so the returned buffer is the only copy we control.
+    """
+    buf = bytearray(getpass.getpass(prompt), "utf-8")
+    while buf and buf[-1] in _WHITESPACE:
+        buf.pop()
+    start = 0
+    while start < len(buf) and buf[start] in _WHITESPACE:
+        start += 1
+    if start:
+        del buf[:start]
+    return buf
+
+
+# (attribute, error message) pairs checked by validate_credentials
+_REDDIT_REQUIRED = (
+    ("client_id", "Reddit client_id is required"),
+    ("client_secret", "Reddit client_secret is required"),
+    ("username", "Reddit username is required"),
+    ("password", "Reddit password is required"),
+)
+_LLM_REQUIRED = (
+    ("api_key", "LLM API key is required"),
+)
+_VALID_PROVIDERS = frozenset({"openai", "anthropic"})
+
+
+@dataclass(slots=True, frozen=True)
 class RedditConfig:
-    """Reddit API configuration."""
+    """Reddit API configuration. Secrets are kept in wipeable bytearrays."""
     client_id: str
-    client_secret: str
+    client_secret: bytearray
     username: str
-    password: str
+    password: bytearray
     user_agent: str = "RedditWithLLM/1.0"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LLMConfig:
-    """LLM API configuration."""
+    """LLM API configuration. The API key is kept in a wipeable bytearray."""
     provider: str
-    api_key: str
+    api_key: bytearray
     model: str = "gpt-3.5-turbo"
     max_tokens: int = 1000
     temperature: float = 0.7
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AppConfig:
     """Application configuration."""
     debug: bool = True
     max_posts: int = 10
     default_subreddit: str = "AskReddit"
+    cache_feeds: bool = False  # Opt-in: writes fetched Reddit content (never credentials) to disk
 
 
 class RuntimeCredentialManager:
@@ -60,19 +110,24 @@ class RuntimeCredentialManager:
             # Collect Reddit credentials
             print("📱 Reddit API Credentials:")
             reddit_client_id = input("   Reddit Client ID: ").strip()
-            reddit_client_secret = getpass.getpass("   Reddit Client Secret: ").strip()
+            reddit_client_secret = _secure_input("   Reddit Client Secret: ")
             reddit_username = input("   Reddit Username: ").strip()
-            reddit_password = getpass.getpass("   Reddit Password: ").strip()
+            reddit_password = _secure_input("   Reddit Password: ")
             
             # Collect LLM credentials
             print("\n🤖 LLM API Configuration:")
             print("   Supported providers: openai, anthropic")
             llm_provider = input("   LLM Provider (openai): ").strip() or "openai"
-            llm_api_key = getpass.getpass("   LLM API Key: ").strip()
+            llm_api_key = _secure_input("   LLM API Key: ")
             
             # Optional LLM settings
             llm_model = input("   LLM Model (gpt-3.5-turbo): ").strip() or "gpt-3.5-turbo"
             
+            # Optional app settings
+            print("\n⚙️  App Settings:")
+            cache_answer = input("   Cache fetched Reddit content locally for faster restarts? (y/N): ").strip()
+            self.app_config = AppConfig(cache_feeds=cache_answer.lower() in ("y", "yes"))
+            
             # Create configuration objects
             self.reddit_config = RedditConfig(
                 client_id=reddit_client_id,
@@ -106,26 +161,16 @@ class RuntimeCredentialManager:
         Returns:
             bool: True if credentials are valid, False otherwise.
         """
-        errors = []
+        if not self.reddit_config or not self.llm_config:
+            print("❌ Credential validation failed:")
+            print("   • Credentials have not been collected")
+            return False
         
-        # Validate Reddit configuration
-        if not self.reddit_config.client_id:
-            errors.append("Reddit client_id is required")
-            
-        if not self.reddit_config.client_secret:
-            errors.append("Reddit client_secret is required")
-            
-        if not self.reddit_config.username:
-            errors.append("Reddit username is required")
-            
-        if not self.reddit_config.password:
-            errors.append("Reddit password is required")
+        # Validate required Reddit and LLM fields from the rule tables
+        errors = [msg for attr, msg in _REDDIT_REQUIRED if not getattr(self.reddit_config, attr)]
+        errors.extend(msg for attr, msg in _LLM_REQUIRED if not getattr(self.llm_config, attr))
         
-        # Validate LLM configuration
-        if not self.llm_config.api_key:
-            errors.append("LLM API key is required")
-            
-        if self.llm_config.provider not in ["openai", "anthropic"]:
+        if self.llm_config.provider not in _VALID_PROVIDERS:
             errors.append(f"Unsupported LLM provider: {self.llm_config.provider}")
         
         if errors:
@@ -156,14 +201,14 @@ class RuntimeCredentialManager:
     def clear_credentials(self):
         """Securely clear credentials from memory."""
         if self.reddit_config:
-            # Clear sensitive data
-            self.reddit_config.client_secret = ""
-            self.reddit_config.password = ""
+            # Zero sensitive data in place
+            wipe_secret(self.reddit_config.client_secret)
+            wipe_secret(self.reddit_config.password)
             self.reddit_config = None
             
         if self.llm_config:
-            # Clear API key
-            self.llm_config.api_key = ""
+            # Zero API key in place
+            wipe_secret(self.llm_config.api_key)
             self.llm_config = None
             
         print("🔒 Credentials cleared from memory")
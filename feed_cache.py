@@ -0,0 +1,115 @@
+"""
+Local feed cache for RedditWithLLM.
+Stores fetched Reddit listings so later runs only download new items.
+Only Reddit content is cached here - credentials are NEVER written to disk.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Optional speedup; falls back to the json module
+
+
+# Default on-disk location of the feed cache
+DEFAULT_CACHE_PATH = "~/.cache/redditwithllm/feeds.sqlite3"
+
+# Cached listings older than this are refetched in full so scores and deletions catch up
+MAX_CACHE_AGE_SECONDS = 6 * 60 * 60
+
+
+def _dumps_json(items: List[Dict[str, Any]]) -> bytes:
+    """Serialize listing items to compact UTF-8 JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(items)
+    return json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FeedCache:
+    """SQLite-backed cache of listing items keyed by (username, listing)."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_age: float = MAX_CACHE_AGE_SECONDS):
+        """Open (or create) the cache database at the given path."""
+        self.path = os.path.expanduser(path)
+        self.max_age = max_age
+        # The cache holds private saved items and comment history, so only the owner may read it
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        os.close(os.open(self.path, os.O_CREAT | os.O_WRONLY, 0o600))
+        os.chmod(self.path, 0o600)  # Also tighten caches created before permissions were set
+
+        # Listings are fetched from worker threads, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS feeds (
+                    username TEXT NOT NULL,
+                    listing TEXT NOT NULL,
+                    items TEXT NOT NULL,
+                    newest_fullname TEXT,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (username, listing)
+                )"""
+            )
+
+    def get(self, username: str, listing: str) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[float]]:
+        """
+        Get cached items for a listing.
+
+        Args:
+            username: Reddit username the listing belongs to
+            listing: Listing name (e.g. "submissions", "comments", "saved")
+
+        Returns:
+            Tuple of (cached items, newest fullname seen, time of the last full
+            fetch). Missing or expired entries return ([], None, None) so the
+            caller does a full fetch.
+        """
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT items, newest_fullname, fetched_at FROM feeds WHERE username = ? AND listing = ?",
+                    (username.lower(), listing)
+                ).fetchone()
+            if row is None or time.time() - row[2] > self.max_age:
+                return [], None, None
+            # Rows may hold text (older caches) or _dumps_json bytes; both loaders accept either
+            return (orjson or json).loads(row[0]), row[1], row[2]
+        except (sqlite3.Error, ValueError) as e:
+            # A broken cache entry just means a full fetch
+            print(f"⚠️  Could not read feed cache for {listing}: {e}")
+            return [], None, None
+
+    def put(self, username: str, listing: str, items: List[Dict[str, Any]], newest_fullname: Optional[str],
+            fetched_at: Optional[float] = None):
+        """
+        Store the items for a listing along with the newest fullname seen.
+
+        Args:
+            username: Reddit username the listing belongs to
+            listing: Listing name
+            items: Items to cache, newest first
+            newest_fullname: Fullname of the newest item, used as the next "before" marker
+            fetched_at: Time of the last full fetch; pass the cached value after a
+                delta fetch so the entry still expires on schedule (defaults to now)
+        """
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?)",
+                    (username.lower(), listing, _dumps_json(items), newest_fullname, fetched_at or time.time())
+                )
+        except (sqlite3.Error, TypeError) as e:
+            # TypeError: an item that won't serialize; skip caching rather than fail the fetch
+            print(f"⚠️  Could not update feed cache for {listing}: {e}")
+
+    def close(self):
+        """Close the cache database."""
+        with self._lock:
+            self._conn.close()
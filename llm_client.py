@@ -3,13 +3,105 @@ LLM API client for RedditWithLLM.
 Handles secure connection to ChatGPT/OpenAI and query processing.
 """
 
-import openai
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Final, Tuple, Union
 from dataclasses import dataclass
+from collections import OrderedDict
+import hashlib
 import json
+import sys
 
 
-@dataclass
+# Maximum number of memoized responses kept per client
+RESPONSE_CACHE_SIZE: Final[int] = 128
+
+# Context window sizes (prompt + completion tokens) for known models
+MODEL_CTX: Final[Dict[str, int]] = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-3.5-turbo-16k": 16385,
+    "gpt-4": 8192,
+    "gpt-4-32k": 32768,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+}
+
+# Allowance for the per-message framing tokens the chat format adds
+_MESSAGE_OVERHEAD_TOKENS: Final[int] = 16
+
+# The combined request answers two prompts at once, so it gets twice the answer budget
+_COMBINED_MAX_TOKENS_FACTOR: Final[int] = 2
+
+_TRUNCATION_MARKER: Final[str] = "\n\n[... Reddit data truncated to fit the model's context window ...]\n\n"
+
+# System prompt for Reddit analysis
+_SYSTEM_PROMPT: Final[str] = """You are a helpful assistant that analyzes Reddit account data. 
+You have been provided with a user's Reddit account summary including their posts, comments, 
+karma, active subreddits, and other account information. 
+
+Please answer the user's questions about their Reddit account based on this data. 
+Be specific, helpful, and provide insights when possible. If the data doesn't contain 
+enough information to answer a question, say so clearly.
+
+Keep responses conversational and engaging while being accurate to the provided data."""
+
+# Shared, never-mutated system message prepended to every request
+_SYSTEM_MSG: Final[Dict[str, str]] = {"role": "system", "content": _SYSTEM_PROMPT}
+
+_ANALYSIS_PROMPT: Final[str] = """Based on this Reddit account data, please provide insights about:
+
+1. **Posting Patterns**: What topics does this user typically post about?
+2. **Community Engagement**: Which communities are they most active in and why?
+3. **Content Style**: What's their commenting/posting style?
+4. **Interests**: What are their main interests based on their activity?
+5. **Engagement Quality**: How well do their posts and comments perform?
+
+Please be specific and provide actionable insights where possible."""
+
+_IMPROVEMENT_PROMPT: Final[str] = """Based on my Reddit activity data, please suggest ways I could:
+
+1. **Improve Engagement**: How can I get better responses to my posts and comments?
+2. **Discover Communities**: What new subreddits might I enjoy based on my interests?
+3. **Content Strategy**: How can I create more valuable content?
+4. **Community Participation**: How can I be a better community member?
+5. **Growth Opportunities**: How can I grow my karma and positive impact?
+
+Please provide specific, actionable advice based on my actual Reddit data."""
+
+# Asks for both of the above in one JSON object so the summary is sent once
+_COMBINED_PROMPT: Final[str] = f"""Please answer both of the following requests about my Reddit account data.
+
+INSIGHTS REQUEST:
+{_ANALYSIS_PROMPT}
+
+IMPROVEMENTS REQUEST:
+{_IMPROVEMENT_PROMPT}
+
+Respond with a JSON object with exactly two string fields: "insights" containing your answer to the
+insights request, and "improvements" containing your answer to the improvements request."""
+
+# Templates take the subreddit names via str.format
+_COMPARE_TEMPLATE: Final[str] = """Based on my Reddit activity data, please compare my participation in r/{s1} vs r/{s2}:
+
+1. **Activity Level**: How active am I in each community?
+2. **Content Type**: What kind of content do I post/comment in each?
+3. **Engagement**: How well do my contributions perform in each?
+4. **Community Fit**: Which community seems to be a better fit for me and why?
+5. **Recommendations**: How can I improve my participation in each community?
+
+If I haven't been active in one or both of these subreddits, please let me know and suggest similar communities I am active in."""
+
+_CONTENT_TEMPLATE: Final[str] = """Based on my Reddit activity and interests, please suggest content ideas for r/{sr}:
+
+1. **Post Ideas**: What kind of posts would be valuable for this community and align with my interests?
+2. **Discussion Topics**: What discussions could I start that would engage the community?
+3. **Content Format**: What format (text, link, image, etc.) works best for my style and this subreddit?
+4. **Timing**: Based on my activity patterns, when might be the best time to post?
+5. **Engagement Strategy**: How can I encourage meaningful discussions?
+
+Please base suggestions on my actual interests and past successful content."""
+
+
+@dataclass(slots=True, frozen=True)
 class LLMResponse:
     """Container for LLM response data."""
     response_text: str
@@ -22,72 +114,156 @@ class LLMResponse:
 class LLMClient:
     """Secure LLM API client for ChatGPT integration."""
     
-    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo", max_tokens: int = 1000, temperature: float = 0.7):
-        """Initialize LLM client with API credentials."""
+    def __init__(self, api_key: Union[str, bytearray], model: str = "gpt-3.5-turbo", max_tokens: int = 1000,
+                 temperature: float = 0.7):
+        """Initialize LLM client with API credentials (str or bytearray)."""
+        # Imported here so the CLI starts without loading openai and its dependencies
+        import openai
+        
         # Initialize OpenAI client (for openai>=1.0.0)
+        # A bytearray key is only decoded here, for the copy the OpenAI client keeps
+        if isinstance(api_key, bytearray):
+            api_key = api_key.decode("utf-8")
         self.client = openai.OpenAI(api_key=api_key)
+        del api_key  # Drop our reference to the decoded key
+        self._auth_error = openai.AuthenticationError
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
+        # LRU cache of response text keyed by a hash of the full request
+        self._response_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._encoding = self._load_encoding(model)
         
-    def test_connection(self) -> bool:
-        """Test ChatGPT API connection."""
+    @staticmethod
+    def _load_encoding(model: str):
+        """Get the tiktoken encoding for a model, or None if tiktoken is unavailable."""
         try:
-            # Simple test query using new OpenAI 1.0.0+ API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": "Hello"}],
-                max_tokens=10
-            )
-            return response.choices[0].message.content is not None
+            import tiktoken
+        except ImportError:
+            return None
+        try:
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                # Unknown or newer model name; cl100k_base covers the GPT-3.5/4 family
+                return tiktoken.get_encoding("cl100k_base")
         except Exception as e:
-            print(f"❌ ChatGPT connection failed: {e}")
-            return False
+            # The BPE file is downloaded on first use; without it, skip context fitting
+            print(f"⚠️  Token counting disabled, could not load tiktoken encoding: {e}")
+            return None
     
-    def query_about_reddit_data(self, reddit_summary: str, user_question: str) -> LLMResponse:
+    def _fit_to_context(self, system_prompt: str, user_message: str, max_tokens: int) -> str:
         """
-        Query ChatGPT about user's Reddit data.
+        Trim the middle of the user message if the request would overflow the context window.
+        
+        The start (account overview) and the end (the question) are kept. Without
+        tiktoken or for unknown models the message is returned unchanged.
+        """
+        context_size = MODEL_CTX.get(self.model)
+        if self._encoding is None or context_size is None:
+            return user_message
+        
+        # encode_ordinary treats text like "<|endoftext|>" in Reddit posts as plain text instead of raising
+        user_tokens = self._encoding.encode_ordinary(user_message)
+        budget = (context_size - max_tokens - len(self._encoding.encode_ordinary(system_prompt))
+                  - 2 * _MESSAGE_OVERHEAD_TOKENS)
+        if len(user_tokens) <= budget:
+            return user_message
+        
+        keep = max(budget - len(self._encoding.encode_ordinary(_TRUNCATION_MARKER)), 0)
+        tail = keep // 3
+        head = keep - tail
+        return (self._encoding.decode(user_tokens[:head]) + _TRUNCATION_MARKER
+                + self._encoding.decode(user_tokens[len(user_tokens) - tail:]))
+        
+    def clear_cache(self):
+        """Drop all memoized responses."""
+        self._response_cache.clear()
+    
+    def _cache_key(self, system_prompt: str, user_message: str, response_format: Optional[Dict[str, str]] = None) -> str:
+        """Build a cache key from everything that affects the completion."""
+        format_type = response_format["type"] if response_format else "text"
+        raw = f"{self.model}|{self.temperature}|{self.max_tokens}|{format_type}|{system_prompt}|{user_message}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    def _question_cache_key(self, summary_digest: bytes, user_question: str,
+                            response_format: Optional[Dict[str, str]] = None) -> str:
+        """Build a cache key from a precomputed summary digest instead of the full summary text."""
+        return self._cache_key(_SYSTEM_PROMPT, f"{summary_digest.hex()}|{user_question}", response_format)
+    
+    def _chat(self, system_prompt: str, user_message: str, response_format: Optional[Dict[str, str]] = None,
+              stream: bool = False, cache_key: Optional[str] = None, max_tokens: Optional[int] = None) -> LLMResponse:
+        """
+        Send a system + user message pair to ChatGPT, memoizing successful responses.
         
         Args:
-            reddit_summary: Formatted summary of user's Reddit data
-            user_question: User's question about their Reddit account
+            system_prompt: System prompt for the conversation
+            user_message: User message content
+            response_format: Optional OpenAI response_format (e.g. {"type": "json_object"})
+            stream: Write the response to stdout as it is generated
+            cache_key: Precomputed cache key; derived from the messages when omitted
+            max_tokens: Answer token limit for this request; defaults to self.max_tokens
             
         Returns:
-            LLMResponse: ChatGPT's response with metadata
+            LLMResponse: ChatGPT's response (tokens_used is 0 for cache hits)
         """
+        key = cache_key or self._cache_key(system_prompt, user_message, response_format)
+        max_tokens = max_tokens or self.max_tokens
+        cached_text = self._response_cache.get(key)
+        if cached_text is not None:
+            self._response_cache.move_to_end(key)
+            if stream:
+                sys.stdout.write(cached_text + "\n")
+                sys.stdout.flush()
+            return LLMResponse(
+                response_text=cached_text,
+                tokens_used=0,
+                model_used=self.model,
+                success=True
+            )
+        
+        # Reuse the prebuilt system message for the default prompt
+        if system_prompt is _SYSTEM_PROMPT:
+            system_msg = _SYSTEM_MSG
+        else:
+            system_msg = {"role": "system", "content": system_prompt}
+        
+        request_kwargs: Dict[str, Any] = {}
+        if response_format:
+            request_kwargs["response_format"] = response_format
+        
+        if stream:
+            request_kwargs["stream"] = True
+            # Ask for token usage in the final chunk
+            request_kwargs["extra_body"] = {"stream_options": {"include_usage": True}}
+        
         try:
-            # Construct system prompt for Reddit analysis
-            system_prompt = """You are a helpful assistant that analyzes Reddit account data. 
-You have been provided with a user's Reddit account summary including their posts, comments, 
-karma, active subreddits, and other account information. 
-
-Please answer the user's questions about their Reddit account based on this data. 
-Be specific, helpful, and provide insights when possible. If the data doesn't contain 
-enough information to answer a question, say so clearly.
-
-Keep responses conversational and engaging while being accurate to the provided data."""
-
-            # Construct user message with Reddit data and question
-            user_message = f"""Here is my Reddit account data:
-
-{reddit_summary}
-
-My question: {user_question}"""
-
+            # Counting tokens locally is far cheaper than a rejected round-trip
+            user_message = self._fit_to_context(system_prompt, user_message, max_tokens)
+            
             # Make API call to ChatGPT using new OpenAI 1.0.0+ API
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    system_msg,
                     {"role": "user", "content": user_message}
                 ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
+                max_tokens=max_tokens,
+                temperature=self.temperature,
+                **request_kwargs
             )
             
             # Extract response data
-            response_text = response.choices[0].message.content
-            tokens_used = response.usage.total_tokens if response.usage else 0
+            if stream:
+                response_text, tokens_used = self._consume_stream(response)
+            else:
+                response_text = response.choices[0].message.content
+                tokens_used = response.usage.total_tokens if response.usage else 0
+            
+            if response_text is not None:
+                self._response_cache[key] = response_text
+                if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                    self._response_cache.popitem(last=False)
             
             return LLMResponse(
                 response_text=response_text,
@@ -97,59 +273,169 @@ My question: {user_question}"""
             )
             
         except Exception as e:
+            error_message = str(e)
+            if isinstance(e, self._auth_error):
+                # There is no startup probe, so this is where a bad API key shows up
+                error_message = f"ChatGPT authentication failed, check your API key ({e})"
             return LLMResponse(
                 response_text="",
                 tokens_used=0,
                 model_used=self.model,
                 success=False,
-                error_message=str(e)
+                error_message=error_message
             )
+        
+    def _consume_stream(self, response) -> Tuple[str, int]:
+        """Print streamed chunks as they arrive and return (full text, tokens used)."""
+        parts: List[str] = []
+        tokens_used = 0
+        for chunk in response:
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    sys.stdout.write(delta)
+                    sys.stdout.flush()
+                    parts.append(delta)
+            # openai 1.3.0 has no typed chunk usage, so it arrives as a plain dict extra
+            usage = getattr(chunk, "usage", None)
+            if usage:
+                tokens_used = usage["total_tokens"] if isinstance(usage, dict) else usage.total_tokens
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+        return "".join(parts), tokens_used
     
-    def analyze_reddit_patterns(self, reddit_summary: str) -> LLMResponse:
+    def test_connection(self) -> bool:
+        """Test ChatGPT API connection."""
+        try:
+            # Simple test query using new OpenAI 1.0.0+ API
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": "Hello"}],
+                max_tokens=10
+            )
+            return response.choices[0].message.content is not None
+        except Exception as e:
+            print(f"❌ ChatGPT connection failed: {e}")
+            return False
+    
+    def _build_user_message(self, reddit_summary: str, user_question: str) -> str:
+        """Combine the Reddit summary and a question into the user message."""
+        return f"""Here is my Reddit account data:
+
+{reddit_summary}
+
+My question: {user_question}"""
+    
+    def query_about_reddit_data(self, reddit_summary: str, user_question: str, stream: bool = False,
+                                summary_digest: Optional[bytes] = None) -> LLMResponse:
+        """
+        Query ChatGPT about user's Reddit data.
+        
+        Args:
+            reddit_summary: Formatted summary of user's Reddit data
+            user_question: User's question about their Reddit account
+            stream: Print the response to stdout as it is generated
+            summary_digest: Optional precomputed digest of reddit_summary, used for the cache key
+            
+        Returns:
+            LLMResponse: ChatGPT's response with metadata
+        """
+        # Construct user message with Reddit data and question
+        user_message = self._build_user_message(reddit_summary, user_question)
+        cache_key = self._question_cache_key(summary_digest, user_question) if summary_digest else None
+        return self._chat(_SYSTEM_PROMPT, user_message, stream=stream, cache_key=cache_key)
+    
+    def analyze_reddit_patterns(self, reddit_summary: str, stream: bool = False,
+                                summary_digest: Optional[bytes] = None) -> LLMResponse:
         """
         Get ChatGPT analysis of user's Reddit patterns and insights.
         
         Args:
             reddit_summary: Formatted summary of user's Reddit data
+            stream: Print the response to stdout as it is generated
+            summary_digest: Optional precomputed digest of reddit_summary, used for the cache key
             
         Returns:
             LLMResponse: ChatGPT's analysis with insights
         """
-        analysis_prompt = """Based on this Reddit account data, please provide insights about:
-
-1. **Posting Patterns**: What topics does this user typically post about?
-2. **Community Engagement**: Which communities are they most active in and why?
-3. **Content Style**: What's their commenting/posting style?
-4. **Interests**: What are their main interests based on their activity?
-5. **Engagement Quality**: How well do their posts and comments perform?
-
-Please be specific and provide actionable insights where possible."""
-
-        return self.query_about_reddit_data(reddit_summary, analysis_prompt)
+        return self.query_about_reddit_data(reddit_summary, _ANALYSIS_PROMPT, stream=stream,
+                                            summary_digest=summary_digest)
     
-    def suggest_improvements(self, reddit_summary: str) -> LLMResponse:
+    def suggest_improvements(self, reddit_summary: str, stream: bool = False,
+                             summary_digest: Optional[bytes] = None) -> LLMResponse:
         """
         Get ChatGPT suggestions for improving Reddit engagement.
         
         Args:
             reddit_summary: Formatted summary of user's Reddit data
+            stream: Print the response to stdout as it is generated
+            summary_digest: Optional precomputed digest of reddit_summary, used for the cache key
             
         Returns:
             LLMResponse: ChatGPT's suggestions for improvement
         """
-        improvement_prompt = """Based on my Reddit activity data, please suggest ways I could:
-
-1. **Improve Engagement**: How can I get better responses to my posts and comments?
-2. **Discover Communities**: What new subreddits might I enjoy based on my interests?
-3. **Content Strategy**: How can I create more valuable content?
-4. **Community Participation**: How can I be a better community member?
-5. **Growth Opportunities**: How can I grow my karma and positive impact?
-
-Please provide specific, actionable advice based on my actual Reddit data."""
-
-        return self.query_about_reddit_data(reddit_summary, improvement_prompt)
+        return self.query_about_reddit_data(reddit_summary, _IMPROVEMENT_PROMPT, stream=stream,
+                                            summary_digest=summary_digest)
     
-    def compare_subreddits(self, reddit_summary: str, subreddit1: str, subreddit2: str) -> LLMResponse:
+    def combined_analysis(self, reddit_summary: str,
+                          summary_digest: Optional[bytes] = None) -> Tuple[LLMResponse, LLMResponse]:
+        """
+        Get pattern insights and improvement suggestions from a single ChatGPT request.
+        
+        The Reddit summary is only sent once, so this costs roughly half the prompt
+        tokens of calling analyze_reddit_patterns and suggest_improvements separately.
+        
+        Args:
+            reddit_summary: Formatted summary of user's Reddit data
+            summary_digest: Optional precomputed digest of reddit_summary, used for the cache key
+            
+        Returns:
+            Tuple[LLMResponse, LLMResponse]: (insights, improvements), both reporting
+            the total tokens used by the shared request
+        """
+        response_format = {"type": "json_object"}
+        user_message = self._build_user_message(reddit_summary, _COMBINED_PROMPT)
+        if summary_digest:
+            cache_key = self._question_cache_key(summary_digest, _COMBINED_PROMPT, response_format)
+        else:
+            cache_key = self._cache_key(_SYSTEM_PROMPT, user_message, response_format)
+        response = self._chat(_SYSTEM_PROMPT, user_message, response_format=response_format, cache_key=cache_key,
+                              max_tokens=self.max_tokens * _COMBINED_MAX_TOKENS_FACTOR)
+        if not response.success:
+            return response, response
+        
+        try:
+            parsed = json.loads(response.response_text)
+            insights_text = parsed["insights"]
+            improvements_text = parsed["improvements"]
+        except (TypeError, ValueError, KeyError) as e:
+            # Usually JSON cut off at the token limit; don't let the cache replay it on every retry
+            self._response_cache.pop(cache_key, None)
+            failed = LLMResponse(
+                response_text="",
+                tokens_used=response.tokens_used,
+                model_used=response.model_used,
+                success=False,
+                error_message=f"Could not parse combined response: {e}"
+            )
+            return failed, failed
+        
+        insights = LLMResponse(
+            response_text=str(insights_text),
+            tokens_used=response.tokens_used,
+            model_used=response.model_used,
+            success=True
+        )
+        improvements = LLMResponse(
+            response_text=str(improvements_text),
+            tokens_used=response.tokens_used,
+            model_used=response.model_used,
+            success=True
+        )
+        return insights, improvements
+    
+    def compare_subreddits(self, reddit_summary: str, subreddit1: str, subreddit2: str, stream: bool = False,
+                           summary_digest: Optional[bytes] = None) -> LLMResponse:
         """
         Compare user's activity in two different subreddits.
         
@@ -157,41 +443,30 @@ Please provide specific, actionable advice based on my actual Reddit data."""
             reddit_summary: Formatted summary of user's Reddit data
             subreddit1: First subreddit to compare
             subreddit2: Second subreddit to compare
+            stream: Print the response to stdout as it is generated
+            summary_digest: Optional precomputed digest of reddit_summary, used for the cache key
             
         Returns:
             LLMResponse: ChatGPT's comparison analysis
         """
-        comparison_prompt = f"""Based on my Reddit activity data, please compare my participation in r/{subreddit1} vs r/{subreddit2}:
-
-1. **Activity Level**: How active am I in each community?
-2. **Content Type**: What kind of content do I post/comment in each?
-3. **Engagement**: How well do my contributions perform in each?
-4. **Community Fit**: Which community seems to be a better fit for me and why?
-5. **Recommendations**: How can I improve my participation in each community?
-
-If I haven't been active in one or both of these subreddits, please let me know and suggest similar communities I am active in."""
-
-        return self.query_about_reddit_data(reddit_summary, comparison_prompt)
+        comparison_prompt = _COMPARE_TEMPLATE.format(s1=subreddit1, s2=subreddit2)
+        return self.query_about_reddit_data(reddit_summary, comparison_prompt, stream=stream,
+                                            summary_digest=summary_digest)
     
-    def get_content_suggestions(self, reddit_summary: str, subreddit: str) -> LLMResponse:
+    def get_content_suggestions(self, reddit_summary: str, subreddit: str, stream: bool = False,
+                                summary_digest: Optional[bytes] = None) -> LLMResponse:
         """
         Get content suggestions for a specific subreddit based on user's interests.
         
         Args:
             reddit_summary: Formatted summary of user's Reddit data
             subreddit: Target subreddit for content suggestions
+            stream: Print the response to stdout as it is generated
+            summary_digest: Optional precomputed digest of reddit_summary, used for the cache key
             
         Returns:
             LLMResponse: ChatGPT's content suggestions
         """
-        content_prompt = f"""Based on my Reddit activity and interests, please suggest content ideas for r/{subreddit}:
-
-1. **Post Ideas**: What kind of posts would be valuable for this community and align with my interests?
-2. **Discussion Topics**: What discussions could I start that would engage the community?
-3. **Content Format**: What format (text, link, image, etc.) works best for my style and this subreddit?
-4. **Timing**: Based on my activity patterns, when might be the best time to post?
-5. **Engagement Strategy**: How can I encourage meaningful discussions?
-
-Please base suggestions on my actual interests and past successful content."""
-
-        return self.query_about_reddit_data(reddit_summary, content_prompt)
+        content_prompt = _CONTENT_TEMPLATE.format(sr=subreddit)
+        return self.query_about_reddit_data(reddit_summary, content_prompt, stream=stream,
+                                            summary_digest=summary_digest)
@@ -50,25 +50,24 @@ def main():
     
     try:
         # Initialize Reddit client
-        print(f"\n{Fore.CYAN}📱 Connecting to Reddit API...{Style.RESET_ALL}")
+        print(f"\n{Fore.CYAN}📱 Setting up Reddit API client...{Style.RESET_ALL}")
         from reddit_client import RedditClient
+        from feed_cache import DEFAULT_CACHE_PATH
         
         reddit_client = RedditClient(
             client_id=reddit_config.client_id,
             client_secret=reddit_config.client_secret,
             username=reddit_config.username,
             password=reddit_config.password,
-            user_agent=reddit_config.user_agent
+            user_agent=reddit_config.user_agent,
+            cache_path=DEFAULT_CACHE_PATH if app_config.cache_feeds else None
         )
         
-        if not reddit_client.test_connection():
-            print(f"{Fore.RED}❌ Failed to connect to Reddit API{Style.RESET_ALL}")
-            return
-            
-        print(f"{Fore.GREEN}✅ Reddit API connected successfully{Style.RESET_ALL}")
+        # No connection probe: the first data fetch reports auth errors just as clearly
+        print(f"{Fore.GREEN}✅ Reddit client ready{Style.RESET_ALL}")
         
         # Initialize ChatGPT client
-        print(f"{Fore.CYAN}🤖 Connecting to ChatGPT API...{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}🤖 Setting up ChatGPT API client...{Style.RESET_ALL}")
         from llm_client import LLMClient
         
         llm_client = LLMClient(
@@ -78,11 +77,9 @@ def main():
             temperature=llm_config.temperature
         )
         
-        if not llm_client.test_connection():
-            print(f"{Fore.RED}❌ Failed to connect to ChatGPT API{Style.RESET_ALL}")
-            return
-            
-        print(f"{Fore.GREEN}✅ ChatGPT API connected successfully{Style.RESET_ALL}")
+        # No connection probe: it would spend a billable request, and the API key
+        # is checked by the first real query anyway
+        print(f"{Fore.GREEN}✅ ChatGPT client ready{Style.RESET_ALL}")
         
         # Launch interactive query interface
         print(f"\n{Fore.GREEN}🎉 All systems ready! Launching interactive mode...{Style.RESET_ALL}")
@@ -3,24 +3,71 @@ Interactive query interface for RedditWithLLM.
 Provides user-friendly interface for asking ChatGPT about Reddit account data.
 """
 
-from typing import Optional
+import functools
+import hashlib
+from typing import Any, Callable, Dict, Optional, TYPE_CHECKING
 from colorama import Fore, Style, init
-from reddit_client import RedditClient, RedditUserData
-from llm_client import LLMClient, LLMResponse
+
+if TYPE_CHECKING:
+    # Only needed for annotations; the instances are passed in by main.py
+    from reddit_client import RedditClient, RedditUserData
+    from llm_client import LLMClient
 
 # Initialize colorama
 init()
 
+# Pre-rendered colored text reused across menu iterations
+_MENU_TEXT = (
+    f"\n{Fore.CYAN}🎯 What would you like to know about your Reddit account?{Style.RESET_ALL}\n"
+    f"{Fore.BLUE}1.{Style.RESET_ALL} Ask a custom question\n"
+    f"{Fore.BLUE}2.{Style.RESET_ALL} Get AI insights about my Reddit patterns\n"
+    f"{Fore.BLUE}3.{Style.RESET_ALL} Get improvement suggestions\n"
+    f"{Fore.BLUE}4.{Style.RESET_ALL} Compare two subreddits\n"
+    f"{Fore.BLUE}5.{Style.RESET_ALL} Get content suggestions for a subreddit\n"
+    f"{Fore.BLUE}6.{Style.RESET_ALL} Get insights + improvements (combined)\n"
+    f"{Fore.BLUE}7.{Style.RESET_ALL} Reload Reddit data\n"
+    f"{Fore.BLUE}8.{Style.RESET_ALL} Exit"
+)
+_CHOICE_PROMPT = f"\n{Fore.CYAN}Enter your choice (1-8): {Style.RESET_ALL}"
+_EXIT_CHOICE = "8"
+_INVALID_CHOICE = f"{Fore.YELLOW}⚠️  Please enter a number between 1-8{Style.RESET_ALL}"
+
+
+def _requires_data(method):
+    """Load Reddit data on first use before running a method that needs it."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.reddit_data or not self.reddit_summary:
+            # load_reddit_data reports its own failure
+            if not self.load_reddit_data():
+                return False
+        return method(self, *args, **kwargs)
+    return wrapper
+
 
 class QueryInterface:
     """Interactive interface for Reddit + ChatGPT queries."""
     
-    def __init__(self, reddit_client: RedditClient, llm_client: LLMClient):
+    def __init__(self, reddit_client: "RedditClient", llm_client: "LLMClient"):
         """Initialize query interface with API clients."""
         self.reddit_client = reddit_client
         self.llm_client = llm_client
-        self.reddit_data: Optional[RedditUserData] = None
+        self.reddit_data: Optional["RedditUserData"] = None
         self.reddit_summary: Optional[str] = None
+        # Per-section summary text, used to send only relevant rows for subreddit prompts
+        self.reddit_sections: Dict[str, str] = {}
+        # Digest of reddit_summary, computed once per load and reused for LLM cache keys
+        self._summary_hash: Optional[bytes] = None
+        # Menu choice -> handler, built once rather than re-evaluated per keystroke
+        self._dispatch: Dict[str, Callable[[], Any]] = {
+            "1": self._prompt_custom_question,
+            "2": self.show_quick_insights,
+            "3": self.show_improvement_suggestions,
+            "4": self.compare_subreddits_interactive,
+            "5": self.get_content_suggestions_interactive,
+            "6": self.show_combined_analysis,
+            "7": self.load_reddit_data,
+        }
         
     def load_reddit_data(self) -> bool:
         """Load and cache Reddit user data."""
@@ -28,8 +75,15 @@ class QueryInterface:
             print(f"{Fore.CYAN}📊 Fetching your Reddit account data...{Style.RESET_ALL}")
             
             # Fetch comprehensive Reddit data
+            previous_hash = self._summary_hash
             self.reddit_data = self.reddit_client.fetch_user_data()
-            self.reddit_summary = self.reddit_client.get_user_summary(self.reddit_data)
+            self.reddit_sections = self.reddit_client.get_user_summary_sections(self.reddit_data)
+            self.reddit_summary = self.reddit_client.get_user_summary(self.reddit_data, self.reddit_sections)
+            self._summary_hash = hashlib.blake2b(self.reddit_summary.encode(), digest_size=16).digest()
+            
+            # Memoized ChatGPT answers are only valid for the summary they were asked about
+            if previous_hash is not None and previous_hash != self._summary_hash:
+                self.llm_client.clear_cache()
             
             print(f"{Fore.GREEN}✅ Reddit data loaded successfully{Style.RESET_ALL}")
             print(f"{Fore.BLUE}📈 Account overview:{Style.RESET_ALL}")
@@ -44,67 +98,83 @@ class QueryInterface:
             
         except Exception as e:
             print(f"{Fore.RED}❌ Failed to load Reddit data: {e}{Style.RESET_ALL}")
+            self.reddit_client.print_error_hints(str(e))
             return False
     
+    @_requires_data
     def show_quick_insights(self):
         """Show quick AI insights about the user's Reddit account."""
-        if not self.reddit_data or not self.reddit_summary:
-            print(f"{Fore.RED}❌ Reddit data not loaded{Style.RESET_ALL}")
-            return
-            
         print(f"\n{Fore.CYAN}🤖 Getting AI insights about your Reddit account...{Style.RESET_ALL}")
         
-        response = self.llm_client.analyze_reddit_patterns(self.reddit_summary)
+        print(f"\n{Fore.GREEN}💡 AI Insights:{Style.RESET_ALL}")
+        response = self.llm_client.analyze_reddit_patterns(
+            self.reddit_summary, stream=True, summary_digest=self._summary_hash
+        )
         
         if response.success:
-            print(f"\n{Fore.GREEN}💡 AI Insights:{Style.RESET_ALL}")
-            print(f"{response.response_text}")
             print(f"\n{Fore.YELLOW}📊 Tokens used: {response.tokens_used}{Style.RESET_ALL}")
         else:
             print(f"{Fore.RED}❌ Failed to get AI insights: {response.error_message}{Style.RESET_ALL}")
     
+    @_requires_data
     def ask_custom_question(self, question: str) -> bool:
         """Ask a custom question about Reddit data."""
-        if not self.reddit_data or not self.reddit_summary:
-            print(f"{Fore.RED}❌ Reddit data not loaded{Style.RESET_ALL}")
-            return False
-            
         print(f"\n{Fore.CYAN}🤖 Asking ChatGPT: {question}{Style.RESET_ALL}")
         
-        response = self.llm_client.query_about_reddit_data(self.reddit_summary, question)
+        print(f"\n{Fore.GREEN}💬 ChatGPT Response:{Style.RESET_ALL}")
+        response = self.llm_client.query_about_reddit_data(
+            self.reddit_summary, question, stream=True, summary_digest=self._summary_hash
+        )
         
         if response.success:
-            print(f"\n{Fore.GREEN}💬 ChatGPT Response:{Style.RESET_ALL}")
-            print(f"{response.response_text}")
             print(f"\n{Fore.YELLOW}📊 Tokens used: {response.tokens_used}{Style.RESET_ALL}")
             return True
         else:
             print(f"{Fore.RED}❌ Failed to get response: {response.error_message}{Style.RESET_ALL}")
             return False
     
+    def _prompt_custom_question(self):
+        """Prompt for a custom question and ask it."""
+        question = input(f"\n{Fore.CYAN}Ask ChatGPT about your Reddit account: {Style.RESET_ALL}").strip()
+        if question:
+            self.ask_custom_question(question)
+    
+    @_requires_data
     def show_improvement_suggestions(self):
         """Get AI suggestions for improving Reddit engagement."""
-        if not self.reddit_data or not self.reddit_summary:
-            print(f"{Fore.RED}❌ Reddit data not loaded{Style.RESET_ALL}")
-            return
-            
         print(f"\n{Fore.CYAN}🚀 Getting improvement suggestions...{Style.RESET_ALL}")
         
-        response = self.llm_client.suggest_improvements(self.reddit_summary)
+        print(f"\n{Fore.GREEN}🎯 Improvement Suggestions:{Style.RESET_ALL}")
+        response = self.llm_client.suggest_improvements(
+            self.reddit_summary, stream=True, summary_digest=self._summary_hash
+        )
         
         if response.success:
-            print(f"\n{Fore.GREEN}🎯 Improvement Suggestions:{Style.RESET_ALL}")
-            print(f"{response.response_text}")
             print(f"\n{Fore.YELLOW}📊 Tokens used: {response.tokens_used}{Style.RESET_ALL}")
         else:
             print(f"{Fore.RED}❌ Failed to get suggestions: {response.error_message}{Style.RESET_ALL}")
     
+    @_requires_data
+    def show_combined_analysis(self):
+        """Get AI insights and improvement suggestions with a single ChatGPT request."""
+        print(f"\n{Fore.CYAN}🤖 Getting AI insights and improvement suggestions...{Style.RESET_ALL}")
+        
+        insights, improvements = self.llm_client.combined_analysis(
+            self.reddit_summary, summary_digest=self._summary_hash
+        )
+        
+        if insights.success and improvements.success:
+            print(f"\n{Fore.GREEN}💡 AI Insights:{Style.RESET_ALL}")
+            print(f"{insights.response_text}")
+            print(f"\n{Fore.GREEN}🎯 Improvement Suggestions:{Style.RESET_ALL}")
+            print(f"{improvements.response_text}")
+            print(f"\n{Fore.YELLOW}📊 Tokens used: {insights.tokens_used}{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.RED}❌ Failed to get combined analysis: {insights.error_message}{Style.RESET_ALL}")
+    
+    @_requires_data
     def compare_subreddits_interactive(self):
         """Interactive subreddit comparison."""
-        if not self.reddit_data or not self.reddit_summary:
-            print(f"{Fore.RED}❌ Reddit data not loaded{Style.RESET_ALL}")
-            return
-            
         print(f"\n{Fore.CYAN}🔍 Subreddit Comparison{Style.RESET_ALL}")
         print(f"{Fore.BLUE}Your most active subreddits:{Style.RESET_ALL}")
         for i, (subreddit, count) in enumerate(list(self.reddit_data.most_active_subreddits.items())[:5], 1):
@@ -116,46 +186,40 @@ class QueryInterface:
         if subreddit1 and subreddit2:
             print(f"\n{Fore.CYAN}🤖 Comparing r/{subreddit1} vs r/{subreddit2}...{Style.RESET_ALL}")
             
-            response = self.llm_client.compare_subreddits(self.reddit_summary, subreddit1, subreddit2)
+            print(f"\n{Fore.GREEN}📊 Comparison Analysis:{Style.RESET_ALL}")
+            # Only the overview and the two subreddits' activity are relevant here
+            focused_summary = self.reddit_client.get_focused_summary(self.reddit_sections, [subreddit1, subreddit2])
+            response = self.llm_client.compare_subreddits(focused_summary, subreddit1, subreddit2, stream=True)
             
             if response.success:
-                print(f"\n{Fore.GREEN}📊 Comparison Analysis:{Style.RESET_ALL}")
-                print(f"{response.response_text}")
                 print(f"\n{Fore.YELLOW}📊 Tokens used: {response.tokens_used}{Style.RESET_ALL}")
             else:
                 print(f"{Fore.RED}❌ Failed to compare subreddits: {response.error_message}{Style.RESET_ALL}")
     
+    @_requires_data
     def get_content_suggestions_interactive(self):
         """Interactive content suggestions for a subreddit."""
-        if not self.reddit_data or not self.reddit_summary:
-            print(f"{Fore.RED}❌ Reddit data not loaded{Style.RESET_ALL}")
-            return
-            
         print(f"\n{Fore.CYAN}💡 Content Suggestions{Style.RESET_ALL}")
         subreddit = input(f"{Fore.CYAN}Enter subreddit for content suggestions: {Style.RESET_ALL}").strip()
         
         if subreddit:
             print(f"\n{Fore.CYAN}🤖 Getting content suggestions for r/{subreddit}...{Style.RESET_ALL}")
             
-            response = self.llm_client.get_content_suggestions(self.reddit_summary, subreddit)
+            print(f"\n{Fore.GREEN}💡 Content Suggestions:{Style.RESET_ALL}")
+            # Overview, interests and recent posts, plus activity in the target subreddit
+            focused_summary = self.reddit_client.get_focused_summary(
+                self.reddit_sections, [subreddit], base_sections=("overview", "subreddits", "posts")
+            )
+            response = self.llm_client.get_content_suggestions(focused_summary, subreddit, stream=True)
             
             if response.success:
-                print(f"\n{Fore.GREEN}💡 Content Suggestions:{Style.RESET_ALL}")
-                print(f"{response.response_text}")
                 print(f"\n{Fore.YELLOW}📊 Tokens used: {response.tokens_used}{Style.RESET_ALL}")
             else:
                 print(f"{Fore.RED}❌ Failed to get suggestions: {response.error_message}{Style.RESET_ALL}")
     
     def show_menu(self):
         """Display interactive menu options."""
-        print(f"\n{Fore.CYAN}🎯 What would you like to know about your Reddit account?{Style.RESET_ALL}")
-        print(f"{Fore.BLUE}1.{Style.RESET_ALL} Ask a custom question")
-        print(f"{Fore.BLUE}2.{Style.RESET_ALL} Get AI insights about my Reddit patterns")
-        print(f"{Fore.BLUE}3.{Style.RESET_ALL} Get improvement suggestions")
-        print(f"{Fore.BLUE}4.{Style.RESET_ALL} Compare two subreddits")
-        print(f"{Fore.BLUE}5.{Style.RESET_ALL} Get content suggestions for a subreddit")
-        print(f"{Fore.BLUE}6.{Style.RESET_ALL} Reload Reddit data")
-        print(f"{Fore.BLUE}7.{Style.RESET_ALL} Exit")
+        print(_MENU_TEXT)
     
     def run_interactive_session(self):
         """Run the main interactive query session."""
@@ -170,34 +234,17 @@ class QueryInterface:
             self.show_menu()
             
             try:
-                choice = input(f"\n{Fore.CYAN}Enter your choice (1-7): {Style.RESET_ALL}").strip()
+                choice = input(_CHOICE_PROMPT).strip()
                 
-                if choice == "1":
-                    question = input(f"\n{Fore.CYAN}Ask ChatGPT about your Reddit account: {Style.RESET_ALL}").strip()
-                    if question:
-                        self.ask_custom_question(question)
-                    
-                elif choice == "2":
-                    self.show_quick_insights()
-                    
-                elif choice == "3":
-                    self.show_improvement_suggestions()
-                    
-                elif choice == "4":
-                    self.compare_subreddits_interactive()
-                    
-                elif choice == "5":
-                    self.get_content_suggestions_interactive()
-                    
-                elif choice == "6":
-                    self.load_reddit_data()
-                    
-                elif choice == "7":
+                if choice == _EXIT_CHOICE:
                     print(f"\n{Fore.GREEN}👋 Thanks for using RedditWithLLM!{Style.RESET_ALL}")
                     break
-                    
+                
+                handler = self._dispatch.get(choice)
+                if handler:
+                    handler()
                 else:
-                    print(f"{Fore.YELLOW}⚠️  Please enter a number between 1-7{Style.RESET_ALL}")
+                    print(_INVALID_CHOICE)
                     
             except KeyboardInterrupt:
                 print(f"\n\n{Fore.GREEN}👋 Goodbye!{Style.RESET_ALL}")
@@ -4,13 +4,77 @@ Handles secure connection to Reddit and data fetching.
 """
 
 import praw
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+import sys
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, List, Optional, Any, Tuple, Union, Callable, Iterable, Iterator
+from dataclasses import dataclass, field
 from datetime import datetime
+import io
 import json
+import re
+import sqlite3
 
+from feed_cache import FeedCache
 
-@dataclass
+
+# Joins an item's searchable fields so a query cannot match across two fields
+_SEARCH_FIELD_SEPARATOR = "\0"
+
+# match_reason reported by search_user_content for each indexed item kind
+_SEARCH_MATCH_REASONS = {
+    'post': 'Title, content, or subreddit match',
+    'comment': 'Comment text or subreddit match',
+    'saved_post': 'Saved post title, content, or subreddit match',
+    'saved_comment': 'Saved comment text or subreddit match',
+}
+
+# Sections joined, in order, to form the full summary
+FULL_SUMMARY_SECTIONS = ("overview", "subreddits", "posts", "comments", "saved")
+
+# Concurrent comment-tree fetches for saved posts; kept low to respect Reddit's rate limits
+COMMENT_FETCH_WORKERS = 8
+
+# Sleep until the rate-limit window resets once fewer requests than this remain
+RATELIMIT_MIN_REMAINING = 2
+
+# HTTP connections kept alive: one per listing thread plus one per comment-fetch thread
+HTTP_POOL_SIZE = 4 + COMMENT_FETCH_WORKERS
+
+# Transient failures retried at the transport level, with exponential backoff
+HTTP_RETRIES = 3
+HTTP_RETRY_BACKOFF = 0.5
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Items Reddit returns per listing request; iterators post-process one page at a time
+LISTING_PAGE_SIZE = 100
+
+# Maximum posts, comments and saved items listed per subreddit section
+SUBREDDIT_SECTION_ITEM_LIMIT = 10
+
+
+def _listing_field(item, name: str, default: Any = None) -> Any:
+    """
+    Read a field straight from a listing item's JSON.
+    
+    Touching an attribute the listing omitted makes PRAW lazily refetch the whole
+    object, one request per item; reading vars() never leaves the listing data.
+    """
+    return vars(item).get(name, default)
+
+
+def _comment_body_lc(comment: Dict[str, Any]) -> str:
+    """Lowercased body of a saved-post comment; entries cached before _body_lc existed lack the key."""
+    return comment.get('_body_lc') or comment['body'].lower()
+
+
+@dataclass(slots=True)
 class RedditUserData:
     """Container for Reddit user account data."""
     username: str
@@ -25,26 +89,110 @@ class RedditUserData:
     saved_posts: List[Dict[str, Any]]
     subscribed_subreddits: List[str]
     most_active_subreddits: Dict[str, int]
+    # (lowercased searchable text, kind, item) built once by RedditClient.build_search_index
+    _search_index: List[Tuple[str, str, Dict[str, Any]]] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
 
 
 class RedditClient:
     """Secure Reddit API client."""
     
-    def __init__(self, client_id: str, client_secret: str, username: str, password: str, user_agent: str):
-        """Initialize Reddit client with user credentials."""
+    def __init__(self, client_id: str, client_secret: Union[str, bytearray], username: str,
+                 password: Union[str, bytearray], user_agent: str, cache_path: Optional[str] = None):
+        """
+        Initialize Reddit client with user credentials (secrets may be bytearrays).
+        
+        If cache_path is given (e.g. feed_cache.DEFAULT_CACHE_PATH), fetched listings
+        are cached there so later runs only download new items. Off by default.
+        """
         # Ensure proper user agent format
         if not user_agent or len(user_agent) < 10:
             user_agent = f"RedditWithLLM:v1.0 (by /u/{username})"
             
+        # Bytearray secrets are only decoded here, for the copies PRAW keeps
+        if isinstance(client_secret, bytearray):
+            client_secret = client_secret.decode("utf-8")
+        if isinstance(password, bytearray):
+            password = password.decode("utf-8")
+            
         self.reddit = praw.Reddit(
             client_id=client_id,
             client_secret=client_secret,
             username=username,
             password=password,
-            user_agent=user_agent
+            user_agent=user_agent,
+            check_for_updates=False  # Skip PRAW's PyPI version check on the first request
         )
+        del client_secret, password  # Drop our references to the decoded secrets
         self.username = username
+        self._configure_http_pool()
+        self._guard_shared_session()
+        
+        self.cache: Optional[FeedCache] = None
+        if cache_path:
+            try:
+                self.cache = FeedCache(cache_path)
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️  Feed cache disabled: {e}")
+        
+    def _configure_http_pool(self):
+        """Size PRAW's keep-alive connection pool for our concurrent fetches and retry transient errors."""
+        try:
+            session = self.reddit._core._requestor._http
+        except AttributeError:
+            return  # PRAW internals changed; keep its default session
+        retries = Retry(
+            total=HTTP_RETRIES,
+            backoff_factor=HTTP_RETRY_BACKOFF,
+            status_forcelist=HTTP_RETRY_STATUSES,
+            raise_on_status=False  # Hand the final response to PRAW so it raises its usual errors
+        )
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retries)
+        session.mount("https://", adapter)
+        # urllib3 only lists br when a brotli decoder is installed, so this never asks for an undecodable body
+        session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    
+    def _guard_shared_session(self):
+        """
+        Serialize the mutable parts of PRAW's shared session so worker threads can share it.
+        
+        PRAW is not thread-safe as a whole, but our workers only share the
+        prawcore session: each thread works on its own listing and submission
+        objects. The session's mutable state is the OAuth token, refreshed in the
+        header callback, and the rate limiter's counters, updated after each
+        response. Both are guarded here, while the HTTP requests themselves run
+        concurrently over the pooled, thread-safe urllib3 connections.
+        """
+        try:
+            session = self.reddit._core
+            rate_limiter = session._rate_limiter
+            set_header_callback = session._set_header_callback
+            update_limits = rate_limiter.update
+        except AttributeError:
+            return  # prawcore internals changed; keep its default session
+        lock = threading.Lock()
+        
+        def locked_set_header_callback():
+            with lock:
+                return set_header_callback()
+        
+        def locked_update_limits(response_headers):
+            with lock:
+                return update_limits(response_headers)
         
+        # Instance attributes shadow the bound methods prawcore looks up per request
+        session._set_header_callback = locked_set_header_callback
+        rate_limiter.update = locked_update_limits
+    
+    def _throttle(self):
+        """Sleep until the rate-limit window resets if Reddit says we are nearly out of requests."""
+        limits = self.reddit.auth.limits
+        remaining = limits.get("remaining")
+        reset_timestamp = limits.get("reset_timestamp")
+        if remaining is not None and reset_timestamp is not None and remaining < RATELIMIT_MIN_REMAINING:
+            time.sleep(max(0, reset_timestamp - time.time()))
+    
     def test_connection(self) -> bool:
         """Test Reddit API connection."""
         try:
@@ -54,25 +202,30 @@ class RedditClient:
         except Exception as e:
             error_msg = str(e)
             print(f"❌ Reddit connection failed: {error_msg}")
-            
-            # Provide helpful debugging info
-            if "401" in error_msg:
-                print(f"🔍 Debug info: 401 Unauthorized - Check your Reddit app credentials:")
-                print(f"   • Verify Client ID and Client Secret are correct")
-                print(f"   • Ensure your Reddit app is set to 'script' type")
-                print(f"   • Confirm username and password are correct")
-                print(f"   • Make sure 2FA is disabled or use app password")
-            elif "403" in error_msg:
-                print(f"🔍 Debug info: 403 Forbidden - User agent or rate limiting issue")
-            elif "429" in error_msg:
-                print(f"🔍 Debug info: 429 Too Many Requests - Rate limited")
-            
+            self.print_error_hints(error_msg)
             return False
     
+    def print_error_hints(self, error_msg: str):
+        """Print debugging hints for common Reddit API errors."""
+        if "401" in error_msg:
+            print(f"🔍 Debug info: 401 Unauthorized - Check your Reddit app credentials:")
+            print(f"   • Verify Client ID and Client Secret are correct")
+            print(f"   • Ensure your Reddit app is set to 'script' type")
+            print(f"   • Confirm username and password are correct")
+            print(f"   • Make sure 2FA is disabled or use app password")
+        elif "403" in error_msg:
+            print(f"🔍 Debug info: 403 Forbidden - User agent or rate limiting issue")
+        elif "429" in error_msg:
+            print(f"🔍 Debug info: 429 Too Many Requests - Rate limited")
+    
     def fetch_user_data(self, limit_posts: int = 25, limit_comments: int = 25, limit_saved: int = 50) -> RedditUserData:
         """
         Fetch comprehensive user data from Reddit.
         
+        The post, comment, saved and subscription listings are independent
+        requests, so they are fetched concurrently over the one PRAW session
+        (see _guard_shared_session for why sharing it is safe).
+        
         Args:
             limit_posts: Number of recent posts to fetch
             limit_comments: Number of recent comments to fetch
@@ -82,151 +235,433 @@ class RedditClient:
             RedditUserData: Comprehensive user account data
         """
         try:
-            # Get user object
-            user = self.reddit.user.me()
-            
-            # Basic user info
-            account_created = datetime.fromtimestamp(user.created_utc)
-            
-            # Fetch recent posts
-            recent_posts = []
-            for submission in user.submissions.new(limit=limit_posts):
-                post_data = {
-                    'title': submission.title,
-                    'subreddit': str(submission.subreddit),
-                    'score': submission.score,
-                    'num_comments': submission.num_comments,
-                    'created_utc': submission.created_utc,
-                    'selftext': submission.selftext[:500] if submission.selftext else '',  # Limit text length
-                    'url': submission.url if not submission.is_self else None,
-                    'upvote_ratio': submission.upvote_ratio
-                }
-                recent_posts.append(post_data)
+            # Fetch the user once up front; PRAW caches it for the workers below
+            self.reddit.user.me()
             
-            # Fetch recent comments
-            recent_comments = []
-            for comment in user.comments.new(limit=limit_comments):
-                comment_data = {
-                    'body': comment.body[:300] if comment.body else '',  # Limit comment length
-                    'subreddit': str(comment.subreddit),
-                    'score': comment.score,
-                    'created_utc': comment.created_utc,
-                    'parent_title': comment.submission.title if comment.submission else 'Unknown'
-                }
-                recent_comments.append(comment_data)
-            
-            # Fetch saved posts
-            saved_posts = []
-            try:
-                print(f"🔍 Fetching saved posts (limit: {limit_saved})...")
-                saved_count = 0
-                for saved_item in user.saved(limit=limit_saved):
-                    saved_count += 1
-                    # Check if it's a submission (post) or comment
-                    if hasattr(saved_item, 'title'):  # It's a submission
-                        # Fetch top comments for this saved post
-                        comments_data = []
-                        try:
-                            saved_item.comments.replace_more(limit=0)  # Remove "more comments" placeholders
-                            for comment in saved_item.comments.list()[:10]:  # Get top 10 comments
-                                if hasattr(comment, 'body') and comment.body != '[deleted]':
-                                    comment_info = {
-                                        'author': str(comment.author) if comment.author else '[deleted]',
-                                        'body': comment.body[:300],  # Limit comment length
-                                        'score': comment.score,
-                                        'created_utc': comment.created_utc,
-                                        'is_submitter': comment.is_submitter,
-                                        'permalink': f"https://reddit.com{comment.permalink}"
-                                    }
-                                    comments_data.append(comment_info)
-                        except Exception as e:
-                            print(f"⚠️  Could not fetch comments for saved post '{saved_item.title[:50]}...': {e}")
-                        
-                        saved_data = {
-                            'type': 'post',
-                            'title': saved_item.title,
-                            'subreddit': str(saved_item.subreddit),
-                            'author': str(saved_item.author) if saved_item.author else '[deleted]',
-                            'score': saved_item.score,
-                            'num_comments': saved_item.num_comments,
-                            'created_utc': saved_item.created_utc,
-                            'selftext': saved_item.selftext[:500] if saved_item.selftext else '',
-                            'url': saved_item.url if not saved_item.is_self else None,
-                            'upvote_ratio': saved_item.upvote_ratio,
-                            'permalink': f"https://reddit.com{saved_item.permalink}",
-                            'comments': comments_data,
-                            'comments_fetched': len(comments_data)
-                        }
-                    else:  # It's a comment
-                        saved_data = {
-                            'type': 'comment',
-                            'body': saved_item.body[:300] if saved_item.body else '',
-                            'subreddit': str(saved_item.subreddit),
-                            'author': str(saved_item.author) if saved_item.author else '[deleted]',
-                            'score': saved_item.score,
-                            'created_utc': saved_item.created_utc,
-                            'parent_title': saved_item.submission.title if saved_item.submission else 'Unknown',
-                            'permalink': f"https://reddit.com{saved_item.permalink}"
-                        }
-                    saved_posts.append(saved_data)
-                print(f"✅ Successfully fetched {len(saved_posts)} saved posts/comments")
-            except Exception as e:
-                print(f"⚠️  Could not fetch saved posts: {e}")
-                print(f"⚠️  This might be due to Reddit API permissions or rate limiting")
-                saved_posts = []
-            
-            # Get subscribed subreddits (limited for privacy)
-            subscribed_subreddits = []
-            try:
-                for subreddit in user.subreddits(limit=50):
-                    subscribed_subreddits.append(str(subreddit))
-            except Exception:
-                # Subreddit list might be private
-                subscribed_subreddits = ["Private/Unavailable"]
+            # Listing fetches are network-bound, so threads overlap their round-trips
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                metadata_future = executor.submit(self.fetch_user_metadata)
+                posts_future = executor.submit(self._fetch_recent_posts, limit_posts)
+                comments_future = executor.submit(self._fetch_recent_comments, limit_comments)
+                saved_future = executor.submit(self._fetch_saved_items, limit_saved)
+                
+                metadata = metadata_future.result()
+                recent_posts = posts_future.result()
+                recent_comments = comments_future.result()
+                saved_posts = saved_future.result()
             
             # Calculate most active subreddits from posts and comments
-            subreddit_activity = {}
-            for post in recent_posts:
-                subreddit = post['subreddit']
-                subreddit_activity[subreddit] = subreddit_activity.get(subreddit, 0) + 1
-                
-            for comment in recent_comments:
-                subreddit = comment['subreddit']
-                subreddit_activity[subreddit] = subreddit_activity.get(subreddit, 0) + 1
+            subreddit_activity = Counter(post['subreddit'] for post in recent_posts)
+            subreddit_activity.update(comment['subreddit'] for comment in recent_comments)
             
-            # Sort by activity
-            most_active = dict(sorted(subreddit_activity.items(), key=lambda x: x[1], reverse=True)[:10])
+            # Top 10 by activity; most_common uses a bounded heap rather than a full sort
+            most_active = dict(subreddit_activity.most_common(10))
             
-            return RedditUserData(
-                username=str(user),
-                account_created=account_created,
-                comment_karma=user.comment_karma,
-                link_karma=user.link_karma,
-                total_karma=user.comment_karma + user.link_karma,
-                is_gold=user.is_gold,
-                is_mod=user.is_mod,
+            user_data = RedditUserData(
+                **metadata,
                 recent_posts=recent_posts,
                 recent_comments=recent_comments,
                 saved_posts=saved_posts,
-                subscribed_subreddits=subscribed_subreddits,
                 most_active_subreddits=most_active
             )
+            self.build_search_index(user_data)
+            return user_data
             
         except Exception as e:
             raise Exception(f"Failed to fetch Reddit user data: {e}")
     
-    def get_user_summary(self, user_data: RedditUserData) -> str:
+    def fetch_user_metadata(self) -> Dict[str, Any]:
+        """
+        Fetch the user's account details and subscriptions, without any listings.
+        
+        Returns:
+            Dict of the RedditUserData fields that do not come from listings
+        """
+        # PRAW caches the me() result, so the listing iterators reuse this request
+        user = self.reddit.user.me()
+        return {
+            'username': str(user),
+            'account_created': datetime.fromtimestamp(user.created_utc),
+            'comment_karma': user.comment_karma,
+            'link_karma': user.link_karma,
+            'total_karma': user.comment_karma + user.link_karma,
+            'is_gold': user.is_gold,
+            'is_mod': user.is_mod,
+            'subscribed_subreddits': self._fetch_subscribed_subreddits(user)
+        }
+    
+    def iter_recent_posts(self, limit: Optional[int] = 25) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the user's recent posts, newest first.
+        
+        Listing pages are requested only as the iterator is consumed, so a caller
+        that stops early (e.g. with itertools.islice) skips the rest of the feed.
+        The feed cache is not consulted; use fetch_user_data for cached fetches.
+        
+        Args:
+            limit: Maximum number of posts to yield, or None for as many as Reddit returns
+        """
+        for _, post_data in self._iter_recent_posts(limit, {}):
+            yield post_data
+    
+    def iter_recent_comments(self, limit: Optional[int] = 25) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the user's recent comments, newest first.
+        
+        Parent titles are looked up one listing page at a time, so stopping early
+        skips both the remaining pages and their title lookups.
+        
+        Args:
+            limit: Maximum number of comments to yield, or None for as many as Reddit returns
+        """
+        for _, comment_data in self._iter_recent_comments(limit, {}):
+            yield comment_data
+    
+    def iter_saved(self, limit: Optional[int] = 50) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the user's saved posts (with top comments) and saved comments.
+        
+        Comment trees and parent titles are fetched one listing page at a time,
+        so stopping early skips the remaining pages and their comment trees.
+        
+        Args:
+            limit: Maximum number of saved items to yield, or None for as many as Reddit returns
+        """
+        for _, saved_data in self._iter_saved(limit, {}):
+            yield saved_data
+    
+    def _new_items(self, listing: Iterable, params: Dict[str, str]) -> Iterator[Any]:
+        """
+        Yield listing items until one repeats or reaches the cached "before" marker.
+        
+        When PRAW pages a "before" listing it also sends "after", and Reddit can
+        answer with items already seen. Stopping there, before any processing,
+        avoids refetching their comment trees and parent titles.
+        """
+        seen = set()
+        before = params.get("before")
+        for item in listing:
+            fullname = item.fullname
+            if fullname in seen or fullname == before:
+                return
+            seen.add(fullname)
+            yield item
+    
+    def _listing_pages(self, listing: Iterable) -> Iterator[List[Any]]:
+        """Group a PRAW listing into lists the size of one API page, so each page costs one request."""
+        listing = iter(listing)
+        while True:
+            page = list(islice(listing, LISTING_PAGE_SIZE))
+            if not page:
+                return
+            yield page
+    
+    def _iter_recent_posts(self, limit: Optional[int], params: Dict[str, str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (fullname, post data) pairs from the user's submissions listing."""
+        for submission in self._new_items(self.reddit.user.me().submissions.new(limit=limit, params=params), params):
+            self._throttle()
+            yield submission.fullname, self._post_data(submission)
+    
+    def _iter_recent_comments(self, limit: Optional[int], params: Dict[str, str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (fullname, comment data) pairs from the user's comments listing."""
+        comments = self._new_items(self.reddit.user.me().comments.new(limit=limit, params=params), params)
+        for page in self._listing_pages(comments):
+            page_data = []
+            pending_titles = []
+            for comment in page:
+                self._throttle()
+                page_data.append((comment.fullname, self._comment_data(comment, pending_titles)))
+            self._fill_parent_titles(pending_titles)
+            yield from page_data
+    
+    def _iter_saved(self, limit: Optional[int], params: Dict[str, str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (fullname, saved item data) pairs from the user's saved listing."""
+        saved = self._new_items(self.reddit.user.me().saved(limit=limit, params=params), params)
+        for page in self._listing_pages(saved):
+            page_data = []
+            submissions = []
+            saved_post_data = []
+            pending_titles = []
+            for saved_item in page:
+                self._throttle()
+                sub_name = sys.intern(saved_item.subreddit.display_name)
+                author = saved_item.author
+                author = str(author) if author else '[deleted]'
+                permalink = f"https://reddit.com{saved_item.permalink}"
+                # Check if it's a submission (post) or comment
+                if isinstance(saved_item, praw.models.Submission):
+                    # Top comments are filled in below, once the whole page is known
+                    submissions.append(saved_item)
+                    selftext = saved_item.selftext or ''
+                    saved_data = {
+                        'type': 'post',
+                        'title': saved_item.title,
+                        'subreddit': sub_name,
+                        'author': author,
+                        'score': saved_item.score,
+                        'num_comments': saved_item.num_comments,
+                        'created_utc': saved_item.created_utc,
+                        'selftext': selftext[:500],
+                        'url': None if saved_item.is_self else saved_item.url,
+                        'upvote_ratio': _listing_field(saved_item, 'upvote_ratio'),
+                        'permalink': permalink,
+                        'comments': [],
+                        'comments_fetched': 0
+                    }
+                    saved_post_data.append(saved_data)
+                else:  # It's a comment
+                    body = saved_item.body or ''
+                    saved_data = {
+                        'type': 'comment',
+                        'body': body[:300],
+                        'subreddit': sub_name,
+                        'author': author,
+                        'score': saved_item.score,
+                        'created_utc': saved_item.created_utc,
+                        'parent_title': 'Unknown',
+                        'permalink': permalink
+                    }
+                    saved_data['parent_title'] = self._listing_parent_title(saved_item, saved_data, pending_titles)
+                page_data.append((saved_item.fullname, saved_data))
+            
+            self._fill_parent_titles(pending_titles)
+            
+            # Each comment tree is its own request, so fetch them in parallel
+            if submissions:
+                workers = min(COMMENT_FETCH_WORKERS, len(submissions))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    all_comments = executor.map(self._fetch_top_comments, submissions)
+                    for saved_data, comments_data in zip(saved_post_data, all_comments):
+                        saved_data['comments'] = comments_data
+                        saved_data['comments_fetched'] = len(comments_data)
+            yield from page_data
+    
+    def _post_data(self, submission) -> Dict[str, Any]:
+        """Build the stored dict for one of the user's posts."""
+        # Each PRAW attribute read goes through its descriptor machinery, so read each once
+        selftext = submission.selftext or ''
+        return {
+            'title': submission.title,
+            'subreddit': sys.intern(submission.subreddit.display_name),
+            'score': submission.score,
+            'num_comments': submission.num_comments,
+            'created_utc': submission.created_utc,
+            'selftext': selftext[:500],  # Limit text length
+            'url': None if submission.is_self else submission.url,
+            'upvote_ratio': _listing_field(submission, 'upvote_ratio')
+        }
+    
+    def _comment_data(self, comment, pending_titles: List[Tuple[Dict[str, Any], str]]) -> Dict[str, Any]:
+        """Build the stored dict for one of the user's comments; see _listing_parent_title for pending_titles."""
+        body = comment.body or ''
+        comment_data = {
+            'body': body[:300],  # Limit comment length
+            'subreddit': sys.intern(comment.subreddit.display_name),
+            'score': comment.score,
+            'created_utc': comment.created_utc,
+            'parent_title': 'Unknown'
+        }
+        comment_data['parent_title'] = self._listing_parent_title(comment, comment_data, pending_titles)
+        return comment_data
+    
+    def fetch_user_subreddit_content(self, subreddit: str, limit: int = 25) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch the user's recent posts and comments in one subreddit.
+        
+        Reddit filters user listings by subreddit server-side (the sr parameter),
+        so this returns up to limit items from that subreddit without paging
+        through the rest of the user's feed.
+        
+        Args:
+            subreddit: Subreddit name, without the r/ prefix
+            limit: Maximum number of posts and of comments to fetch
+            
+        Returns:
+            Dict with 'posts' and 'comments' lists, in the same format as RedditUserData
+        """
+        params = {"sr": subreddit, "sort": "new", "limit": limit}
+        
+        self._throttle()
+        posts = [self._post_data(submission)
+                 for submission in self.reddit.get(f"user/{self.username}/submitted", params=params)]
+        
+        self._throttle()
+        pending_titles = []
+        comments = [self._comment_data(comment, pending_titles)
+                    for comment in self.reddit.get(f"user/{self.username}/comments", params=params)]
+        self._fill_parent_titles(pending_titles)
+        
+        return {'posts': posts, 'comments': comments}
+    
+    def _fetch_recent_posts(self, limit_posts: int) -> List[Dict[str, Any]]:
+        """Fetch the user's most recent posts, downloading only those newer than the cache."""
+        cached_posts, params, newest_cached, fetched_at = self._load_cached_listing("submissions")
+        fetched = list(self._iter_recent_posts(limit_posts, params))
+        return self._store_cached_listing("submissions", fetched, cached_posts, newest_cached, fetched_at, limit_posts)
+    
+    def _fetch_recent_comments(self, limit_comments: int) -> List[Dict[str, Any]]:
+        """Fetch the user's most recent comments, downloading only those newer than the cache."""
+        cached_comments, params, newest_cached, fetched_at = self._load_cached_listing("comments")
+        fetched = list(self._iter_recent_comments(limit_comments, params))
+        return self._store_cached_listing("comments", fetched, cached_comments, newest_cached, fetched_at, limit_comments)
+    
+    def _fetch_saved_items(self, limit_saved: int) -> List[Dict[str, Any]]:
+        """Fetch the user's saved posts (with top comments) and saved comments."""
+        cached_saved, params, newest_cached, fetched_at = self._load_cached_listing("saved")
+        try:
+            print(f"🔍 Fetching saved posts (limit: {limit_saved})...")
+            fetched = list(self._iter_saved(limit_saved, params))
+            print(f"✅ Successfully fetched {len(fetched)} new saved posts/comments")
+            return self._store_cached_listing("saved", fetched, cached_saved, newest_cached, fetched_at, limit_saved)
+        except Exception as e:
+            print(f"⚠️  Could not fetch saved posts: {e}")
+            print(f"⚠️  This might be due to Reddit API permissions or rate limiting")
+            return []
+    
+    def _load_cached_listing(self, listing: str) -> Tuple[List[Dict[str, Any]], Dict[str, str], Optional[str], Optional[float]]:
+        """
+        Load a cached listing and the request params that fetch only newer items.
+        
+        Returns:
+            Tuple of (cached items, listing params, newest cached fullname, time of last full fetch)
+        """
+        if not self.cache:
+            return [], {}, None, None
+        cached_items, newest_fullname, fetched_at = self.cache.get(self.username, listing)
+        for item in cached_items:
+            # Share one string object per subreddit name with freshly fetched items
+            item['subreddit'] = sys.intern(item['subreddit'])
+        params = {"before": newest_fullname} if newest_fullname else {}
+        return cached_items, params, newest_fullname, fetched_at
+    
+    def _store_cached_listing(self, listing: str, fetched: List[Tuple[str, Dict[str, Any]]],
+                              cached_items: List[Dict[str, Any]], newest_cached: Optional[str],
+                              fetched_at: Optional[float], limit: int) -> List[Dict[str, Any]]:
+        """
+        Prepend newly fetched (fullname, item) pairs to the cached items, store the result and return it.
+        
+        Items are also de-duplicated by fullname, so a fetched item that is
+        already cached never appears twice (_new_items stops at most repeats).
+        """
+        newest_fullname = fetched[0][0] if fetched else newest_cached
+        items = []
+        seen = set()
+        for fullname, item in fetched:
+            if fullname not in seen:
+                seen.add(fullname)
+                item['fullname'] = fullname
+                items.append(item)
+        # Entries cached before fullnames were stored have none, so they are always kept
+        items.extend(item for item in cached_items if item.get('fullname') not in seen)
+        items = items[:limit]
+        if self.cache:
+            self.cache.put(self.username, listing, items, newest_fullname, fetched_at)
+        return items
+    
+    def _listing_parent_title(self, comment, comment_data: Dict[str, Any],
+                              pending_titles: List[Tuple[Dict[str, Any], str]]) -> str:
+        """
+        Get a comment's parent post title without a per-comment request.
+        
+        User listings usually include link_title. Otherwise the parent's link_id
+        is queued in pending_titles for one batched lookup by _fill_parent_titles.
+        """
+        link_title = _listing_field(comment, 'link_title')
+        if link_title:
+            return link_title
+        link_id = _listing_field(comment, 'link_id')
+        if link_id:
+            pending_titles.append((comment_data, link_id))
+        return 'Unknown'
+    
+    def _fill_parent_titles(self, pending_titles: List[Tuple[Dict[str, Any], str]]):
+        """Look up queued parent post titles in batches of 100 with reddit.info()."""
+        if not pending_titles:
+            return
+        fullnames = list(dict.fromkeys(link_id for _, link_id in pending_titles))
+        titles = {}
+        try:
+            for start in range(0, len(fullnames), 100):
+                self._throttle()
+                for submission in self.reddit.info(fullnames=fullnames[start:start + 100]):
+                    titles[submission.fullname] = submission.title
+        except Exception as e:
+            print(f"⚠️  Could not fetch parent post titles: {e}")
+        for comment_data, link_id in pending_titles:
+            comment_data['parent_title'] = titles.get(link_id, 'Unknown')
+    
+    def _fetch_top_comments(self, submission) -> List[Dict[str, Any]]:
+        """Fetch the top comments for a saved post."""
+        comments_data = []
+        try:
+            self._throttle()
+            submission.comments.replace_more(limit=0)  # Remove "more comments" placeholders
+            for comment in submission.comments.list()[:10]:  # Get top 10 comments
+                body = getattr(comment, 'body', None)
+                if body is not None and body != '[deleted]':
+                    body = body[:300]  # Limit comment length
+                    author = comment.author
+                    comment_info = {
+                        'author': str(author) if author else '[deleted]',
+                        'body': body,
+                        'score': comment.score,
+                        'created_utc': comment.created_utc,
+                        'is_submitter': comment.is_submitter,
+                        'permalink': f"https://reddit.com{comment.permalink}",
+                        '_body_lc': body.lower()  # Lowercased once for search
+                    }
+                    comments_data.append(comment_info)
+        except Exception as e:
+            print(f"⚠️  Could not fetch comments for saved post '{submission.title[:50]}...': {e}")
+        return comments_data
+    
+    def _fetch_subscribed_subreddits(self, user) -> List[str]:
+        """Fetch the user's subscribed subreddits (limited for privacy)."""
+        subscribed_subreddits = []
+        try:
+            for subreddit in user.subreddits(limit=50):
+                subscribed_subreddits.append(sys.intern(str(subreddit)))
+        except Exception:
+            # Subreddit list might be private
+            subscribed_subreddits = ["Private/Unavailable"]
+        return subscribed_subreddits
+    
+    def get_user_summary(self, user_data: RedditUserData, sections: Optional[Dict[str, str]] = None) -> str:
         """
         Generate a text summary of user data for LLM processing.
         
         Args:
             user_data: Reddit user data
+            sections: Already computed get_user_summary_sections output, if available
             
         Returns:
             str: Formatted summary for LLM
         """
-        summary = f"""
-Reddit Account Summary for {user_data.username}:
+        if sections is None:
+            sections = self.get_user_summary_sections(user_data)
+        
+        buf = io.StringIO()
+        w = buf.write
+        for i, name in enumerate(FULL_SUMMARY_SECTIONS):
+            if i:
+                w("\n\n")
+            w(sections[name])
+        return buf.getvalue().strip()
+    
+    def get_user_summary_sections(self, user_data: RedditUserData) -> Dict[str, str]:
+        """
+        Generate the summary as separate sections so prompts can send only what they need.
+        
+        Args:
+            user_data: Reddit user data
+            
+        Returns:
+            Dict[str, str]: Section text keyed by "overview", "subreddits", "posts",
+            "comments", "saved", plus "r/<name>" (lowercased) for each subreddit
+            the user has posted, commented or saved in
+        """
+        sections = {
+            "overview": f"""Reddit Account Summary for {user_data.username}:
 
 ACCOUNT OVERVIEW:
 - Username: {user_data.username}
@@ -239,21 +674,87 @@ ACTIVITY SUMMARY:
 - Recent posts: {len(user_data.recent_posts)}
 - Recent comments: {len(user_data.recent_comments)}
 - Saved posts/comments: {len(user_data.saved_posts)}
-- Subscribed subreddits: {len(user_data.subscribed_subreddits)}
-
-MOST ACTIVE SUBREDDITS:
-{chr(10).join([f"- r/{sub}: {count} interactions" for sub, count in user_data.most_active_subreddits.items()])}
-
-RECENT POSTS:
-{chr(10).join([f"- [{post['subreddit']}] {post['title']} (Score: {post['score']}, Comments: {post['num_comments']})" for post in user_data.recent_posts[:5]])}
-
-RECENT COMMENTS:
-{chr(10).join([f"- [{comment['subreddit']}] {comment['body'][:100]}... (Score: {comment['score']})" for comment in user_data.recent_comments[:5]])}
-
-SAVED POSTS/COMMENTS:
-{chr(10).join([self._format_saved_item_for_summary(item) for item in user_data.saved_posts[:5]])}
-"""
-        return summary.strip()
+- Subscribed subreddits: {len(user_data.subscribed_subreddits)}""",
+            "subreddits": self._format_section(
+                "MOST ACTIVE SUBREDDITS:", user_data.most_active_subreddits.items(),
+                lambda entry: f"- r/{entry[0]}: {entry[1]} interactions"
+            ),
+            "posts": self._format_section(
+                "RECENT POSTS:", user_data.recent_posts[:5], self._format_post_for_summary
+            ),
+            "comments": self._format_section(
+                "RECENT COMMENTS:", user_data.recent_comments[:5], self._format_comment_for_summary
+            ),
+            "saved": self._format_section(
+                "SAVED POSTS/COMMENTS:", user_data.saved_posts[:5], self._format_saved_item_for_summary
+            ),
+        }
+        
+        # Group activity lines by subreddit for focused prompts
+        per_subreddit: Dict[str, Dict[str, List[str]]] = {}
+        
+        def add_line(subreddit: str, kind: str, line: str):
+            groups = per_subreddit.setdefault(subreddit, {"Posts": [], "Comments": [], "Saved": []})
+            if len(groups[kind]) < SUBREDDIT_SECTION_ITEM_LIMIT:
+                groups[kind].append(line)
+        
+        for post in user_data.recent_posts:
+            add_line(post['subreddit'], "Posts", self._format_post_for_summary(post))
+        for comment in user_data.recent_comments:
+            add_line(comment['subreddit'], "Comments", self._format_comment_for_summary(comment))
+        for item in user_data.saved_posts:
+            add_line(item['subreddit'], "Saved", self._format_saved_item_for_summary(item))
+        
+        for subreddit, groups in per_subreddit.items():
+            lines = [f"ACTIVITY IN r/{subreddit}:"]
+            for kind, kind_lines in groups.items():
+                if kind_lines:
+                    lines.append(f"{kind}:")
+                    lines.extend(kind_lines)
+            sections[f"r/{subreddit.lower()}"] = "\n".join(lines)
+        
+        return sections
+    
+    def get_focused_summary(self, sections: Dict[str, str], subreddits: List[str],
+                            base_sections: Tuple[str, ...] = ("overview", "subreddits")) -> str:
+        """
+        Assemble a summary containing only the given base sections and subreddits.
+        
+        Args:
+            sections: Output of get_user_summary_sections
+            subreddits: Subreddit names, with or without the "r/" prefix
+            base_sections: General sections to include before the subreddit sections
+            
+        Returns:
+            str: Formatted summary for LLM
+        """
+        parts = [sections[name] for name in base_sections]
+        for subreddit in subreddits:
+            name = subreddit.strip()
+            if name.lower().startswith("r/"):
+                name = name[2:]
+            parts.append(sections.get(f"r/{name.lower()}", f"ACTIVITY IN r/{name}:\n- No recent activity"))
+        return "\n\n".join(parts).strip()
+    
+    def _format_section(self, header: str, items: Iterable[Any], format_item: Callable[[Any], str]) -> str:
+        """Write a section header and one formatted line per item straight into a buffer."""
+        buf = io.StringIO()
+        w = buf.write
+        w(header)
+        w("\n")
+        for i, item in enumerate(items):
+            if i:
+                w("\n")
+            w(format_item(item))
+        return buf.getvalue()
+    
+    def _format_post_for_summary(self, post: dict) -> str:
+        """Format a recent post for the summary."""
+        return f"- [{post['subreddit']}] {post['title']} (Score: {post['score']}, Comments: {post['num_comments']})"
+    
+    def _format_comment_for_summary(self, comment: dict) -> str:
+        """Format a recent comment for the summary."""
+        return f"- [{comment['subreddit']}] {comment['body'][:100]}... (Score: {comment['score']})"
     
     def _format_saved_item_for_summary(self, item: dict) -> str:
         """Format a saved item with its comments for the summary."""
@@ -270,76 +771,119 @@ SAVED POSTS/COMMENTS:
         else:  # saved comment
             return f"- [{item['subreddit']}] {item.get('body', '')[:100]}{'...' if len(item.get('body', '')) > 100 else ''} (saved comment)"
     
-    def search_user_content(self, user_data: RedditUserData, query: str) -> List[Dict[str, Any]]:
+    def search_user_content(self, user_data: RedditUserData, query: Union[str, List[str]]) -> List[Dict[str, Any]]:
         """
         Search user's posts and comments for specific content.
         
         Args:
             user_data: Reddit user data
-            query: Search query
+            query: Search query, or a list of terms matching items that contain any of them
             
         Returns:
             List of matching posts and comments
         """
+        if not query and not isinstance(query, str):
+            return []  # No terms means nothing to match
+        if not user_data._search_index:
+            self.build_search_index(user_data)
+        
         results = []
-        query_lower = query.lower()
+        if isinstance(query, str):
+            query_lower = query.lower()
+            
+            def matches(text: str) -> bool:
+                return query_lower in text
+        else:
+            # One compiled alternation scans each item once for all terms
+            matches = re.compile("|".join(re.escape(term.lower()) for term in query)).search
         
-        # Search posts
-        for post in user_data.recent_posts:
-            if (query_lower in post['title'].lower() or 
-                query_lower in post['selftext'].lower() or
-                query_lower in post['subreddit'].lower()):
+        # A query naming one of the user's active subreddits gets that subreddit's
+        # posts and comments from Reddit's filtered listings, not just the in-memory feed
+        fetched_subreddit = None
+        subreddit = self._match_active_subreddit(user_data, query)
+        if subreddit:
+            results = self._search_subreddit_content(subreddit)
+            if results:
+                fetched_subreddit = subreddit
+        
+        for blob, kind, item in user_data._search_index:
+            if kind in ('post', 'comment') and item['subreddit'] == fetched_subreddit:
+                continue  # Already covered by the filtered fetch
+            if not matches(blob):
+                continue
+            
+            if kind == 'saved_post_comments':
+                # The blob only says some comment matched; report the first one only
+                hit = next((comment for comment in item['comments'] if matches(_comment_body_lc(comment))), None)
+                if hit:
+                    results.append({
+                        'type': 'saved_post_comment',
+                        'content': {
+                            'post_title': item['title'],
+                            'post_subreddit': item['subreddit'],
+                            'comment': hit
+                        },
+                        'match_reason': f'Comment in saved post "{item["title"][:50]}..."'
+                    })
+            else:
                 results.append({
-                    'type': 'post',
-                    'content': post,
-                    'match_reason': 'Title, content, or subreddit match'
+                    'type': kind,
+                    'content': item,
+                    'match_reason': _SEARCH_MATCH_REASONS[kind]
                 })
         
-        # Search comments
+        return results
+    
+    def _match_active_subreddit(self, user_data: RedditUserData, query: Union[str, List[str]]) -> Optional[str]:
+        """Return the active subreddit a single-term query names (ignoring case and an r/ prefix), if any."""
+        if not isinstance(query, str):
+            return None
+        name = query.strip().lower()
+        if name.startswith("r/"):
+            name = name[2:]
+        for subreddit in user_data.most_active_subreddits:
+            if subreddit.lower() == name:
+                return subreddit
+        return None
+    
+    def _search_subreddit_content(self, subreddit: str) -> List[Dict[str, Any]]:
+        """Search results for every post and comment the user made in a subreddit, fetched server-side."""
+        try:
+            content = self.fetch_user_subreddit_content(subreddit)
+        except Exception as e:
+            print(f"⚠️  Could not fetch r/{subreddit} content, searching loaded data only: {e}")
+            return []
+        results = [{'type': 'post', 'content': post, 'match_reason': _SEARCH_MATCH_REASONS['post']}
+                   for post in content['posts']]
+        results.extend({'type': 'comment', 'content': comment, 'match_reason': _SEARCH_MATCH_REASONS['comment']}
+                       for comment in content['comments'])
+        return results
+    
+    def build_search_index(self, user_data: RedditUserData):
+        """
+        Precompute lowercased searchable text for every item, so searches skip per-query lower() calls.
+        
+        Args:
+            user_data: Reddit user data to index in place
+        """
+        sep = _SEARCH_FIELD_SEPARATOR
+        index = []
+        
+        for post in user_data.recent_posts:
+            index.append((sep.join((post['title'], post['selftext'], post['subreddit'])).lower(), 'post', post))
+        
         for comment in user_data.recent_comments:
-            if (query_lower in comment['body'].lower() or
-                query_lower in comment['subreddit'].lower()):
-                results.append({
-                    'type': 'comment',
-                    'content': comment,
-                    'match_reason': 'Comment text or subreddit match'
-                })
+            index.append((sep.join((comment['body'], comment['subreddit'])).lower(), 'comment', comment))
         
-        # Search saved posts and comments
         for saved_item in user_data.saved_posts:
             if saved_item['type'] == 'post':
-                # Search in post title, content, and subreddit
-                if (query_lower in saved_item['title'].lower() or 
-                    query_lower in saved_item['selftext'].lower() or
-                    query_lower in saved_item['subreddit'].lower()):
-                    results.append({
-                        'type': 'saved_post',
-                        'content': saved_item,
-                        'match_reason': 'Saved post title, content, or subreddit match'
-                    })
-                
-                # Also search in the comments of saved posts
+                blob = sep.join((saved_item['title'], saved_item['selftext'], saved_item['subreddit'])).lower()
+                index.append((blob, 'saved_post', saved_item))
                 if saved_item.get('comments'):
-                    for comment in saved_item['comments']:
-                        if query_lower in comment['body'].lower():
-                            results.append({
-                                'type': 'saved_post_comment',
-                                'content': {
-                                    'post_title': saved_item['title'],
-                                    'post_subreddit': saved_item['subreddit'],
-                                    'comment': comment
-                                },
-                                'match_reason': f'Comment in saved post "{saved_item["title"][:50]}..."'
-                            })
-                            break  # Only add one match per post to avoid duplicates
-                            
+                    blob = sep.join(_comment_body_lc(comment) for comment in saved_item['comments'])
+                    index.append((blob, 'saved_post_comments', saved_item))
             else:  # saved comment
-                if (query_lower in saved_item['body'].lower() or
-                    query_lower in saved_item['subreddit'].lower()):
-                    results.append({
-                        'type': 'saved_comment',
-                        'content': saved_item,
-                        'match_reason': 'Saved comment text or subreddit match'
-                    })
+                blob = sep.join((saved_item['body'], saved_item['subreddit'])).lower()
+                index.append((blob, 'saved_comment', saved_item))
         
-        return results
+        user_data._search_index = index